@@ -8,20 +8,29 @@ This is the REST API that sits between Streamlit and the RAG chain.
 Endpoints:
   POST /upload      → Upload a PDF resume, ingest into Pinecone
   POST /chat        → Ask a question, get an AI answer
+  POST /chat/stream → Same, streamed token-by-token (Server-Sent Events)
   GET  /health      → Health check
   DELETE /reset     → Delete all vectors for a namespace
 
 Why FastAPI?
 - Async support (handles multiple requests efficiently)
+  Blocking work (PDF parsing, embedding, Pinecone, Groq) is pushed to a
+  worker thread with asyncio.to_thread, so it never stalls the event loop
 - Auto-generates interactive docs at /docs
 - Clean Pydantic validation for request/response bodies
 - Easy to deploy to any cloud provider later
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+import numpy as np
+import asyncio
+import hashlib
+import orjson
 import tempfile
 import os
 import logging
@@ -29,8 +38,12 @@ import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.ingestion import load_and_chunk
-from src.vector_store import ingest_resume, get_vector_store, delete_namespace
-from src.chain import build_rag_chain, ask_question
+from src.vector_store import aingest_resume, get_vector_store, delete_namespace, namespace_generation
+from src.chain import build_rag_chain, ask_question, astream_question, extend_history
+from src.embeddings import get_embeddings, EMBEDDING_DIMENSION
+from src.reranker import get_reranker
+from src.session_store import get_session_store
+from src.env import getenv
 
 # ─────────────────────────────────────────────
 # Setup
@@ -41,7 +54,9 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Chat with Resume API",
     description="Upload a PDF resume and chat with it using AI",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes responses several times faster than stdlib json
+    default_response_class=ORJSONResponse,
 )
 
 # Allow Streamlit frontend to call this API (CORS)
@@ -52,9 +67,112 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory session store
-# In production, you'd use Redis or a database
-sessions: Dict[str, Dict] = {}
+# Session store: chat_history holds LangChain message objects
+# (HumanMessage / AIMessage) so they go straight into the prompt.
+# Redis when REDIS_URL is set (shared across workers), otherwise an
+# in-process TTLCache — see session_store.py. Both expire idle sessions
+# and keep only the most recent messages (bounded prompt size).
+SESSION_EXPIRE_INTERVAL_SECONDS = 300
+sessions = get_session_store()
+
+# Bytes read per step when saving an uploaded PDF to disk
+UPLOAD_READ_SIZE = 1024 * 1024
+
+
+# ─────────────────────────────────────────────
+# Semantic Cache
+# ─────────────────────────────────────────────
+
+class SemanticCache:
+    """
+    Answer cache keyed by (namespace, generation, question MEANING) instead
+    of exact text.
+
+    Every cached question is stored as a row of the matrix E (N × 384).
+    Embeddings are L2-normalized (see embeddings.py), so E @ q is the
+    cosine similarity of the new question against every cached one in a
+    single matrix-vector product.
+
+    A hit (similarity ≥ threshold, same namespace AND generation) skips
+    both Pinecone retrieval and the Groq call — a ~2-5s request becomes
+    a lookup.
+
+    The generation (namespace_generation(), the sidecar's mtime) changes
+    whenever ANY worker re-ingests or resets the namespace, so every
+    worker stops serving answers about the previous resume — not just
+    the one that handled /upload or /reset. Entries from an old
+    generation are never hit again and age out via LRU.
+
+    Memory is bounded: max_entries × 384 × 4 bytes (~1.5 MB for 1024).
+    When full, the least recently used slot is overwritten.
+    """
+
+    def __init__(self, max_entries: int = 1024, threshold: float = 0.95,
+                 dimension: int = EMBEDDING_DIMENSION):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.E = np.zeros((max_entries, dimension), dtype=np.float32)
+        self.keys: List[Optional[Tuple[str, Optional[int]]]] = [None] * max_entries  # (namespace, generation)
+        self.entries: List[Optional[Tuple[str, List[Dict[str, Any]]]]] = [None] * max_entries
+        self.last_used = np.zeros(max_entries, dtype=np.int64)  # LRU clock per slot
+        self.size = 0
+        self._clock = 0
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def lookup(self, namespace: str, generation: Optional[int],
+               q_vec: np.ndarray) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """Return the cached (answer, sources) for a near-identical question, if any."""
+        if self.size == 0:
+            return None
+
+        key = (namespace, generation)
+        scores = self.E[:self.size] @ q_vec
+        same_key = np.fromiter((k == key for k in self.keys[:self.size]),
+                               dtype=bool, count=self.size)
+        scores[~same_key] = -1.0
+
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            return None
+
+        self.last_used[best] = self._tick()
+        return self.entries[best]
+
+    def add(self, namespace: str, generation: Optional[int], q_vec: np.ndarray,
+            answer: str, sources: List[Dict[str, Any]]) -> None:
+        """Store a fresh answer, evicting the least recently used entry when full."""
+        if self.size < self.max_entries:
+            slot = self.size
+            self.size += 1
+        else:
+            slot = int(self.last_used.argmin())
+
+        self.E[slot] = q_vec
+        self.keys[slot] = (namespace, generation)
+        self.entries[slot] = (answer, sources)
+        self.last_used[slot] = self._tick()
+
+    def invalidate(self, namespace: str) -> None:
+        """
+        Drop all entries for a namespace (its resume was replaced or reset).
+        Frees the slots right away in this worker; other workers skip the
+        old entries via the generation check.
+        """
+        keep = [i for i in range(self.size) if self.keys[i][0] != namespace]
+        n = len(keep)
+        self.E[:n] = self.E[keep]
+        self.last_used[:n] = self.last_used[keep]
+        self.keys[:n] = [self.keys[i] for i in keep]
+        self.entries[:n] = [self.entries[i] for i in keep]
+        self.keys[n:self.size] = [None] * (self.size - n)
+        self.entries[n:self.size] = [None] * (self.size - n)
+        self.size = n
+
+
+semantic_cache = SemanticCache()
 
 
 # ─────────────────────────────────────────────
@@ -85,14 +203,63 @@ class UploadResponse(BaseModel):
     chunks_count: int
 
 
+# ─────────────────────────────────────────────
+# Startup
+# ─────────────────────────────────────────────
+
+async def expire_sessions_periodically():
+    """
+    Sweep expired in-memory sessions on a timer, so idle sessions release
+    their memory without waiting for new traffic (no-op for Redis).
+    """
+    while True:
+        await asyncio.sleep(SESSION_EXPIRE_INTERVAL_SECONDS)
+        sessions.expire()
+
+
+@app.on_event("startup")
+async def start_session_expiry():
+    app.state.session_expiry_task = asyncio.create_task(expire_sessions_periodically())
+
+
+@app.on_event("startup")
+async def preload_models():
+    """
+    Load the embedding model, reranker and default vector store once at
+    boot, so the first user request doesn't pay the cold-start cost.
+
+    Each model also runs one dummy inference: the first call allocates
+    ONNX Runtime / PyTorch buffers and picks kernels, which would
+    otherwise stall the first real question.
+    """
+    get_embeddings().embed_query("warmup")
+    get_reranker().predict([("warmup", "warmup")])
+    try:
+        get_vector_store(namespace="default")
+    except Exception as e:
+        logger.warning(f"Could not preload vector store: {str(e)}")
+
+
 # ─────────────────────────────────────────────
 # Endpoints
 # ─────────────────────────────────────────────
 
+HEALTH_BODY = {"status": "ok", "message": "Resume Chat API is running"}
+HEALTH_ETAG = '"' + hashlib.sha1(orjson.dumps(HEALTH_BODY)).hexdigest()[:16] + '"'
+HEALTH_HEADERS = {"Cache-Control": "public, max-age=15", "ETag": HEALTH_ETAG}
+
+
 @app.get("/health")
-async def health_check():
-    """Simple health check — Streamlit pings this on startup."""
-    return {"status": "ok", "message": "Resume Chat API is running"}
+async def health_check(request: Request):
+    """
+    Simple health check — Streamlit pings this on startup.
+
+    Cacheable for 15s, and answers a matching If-None-Match with an
+    empty 304 instead of the body.
+    """
+    if request.headers.get("if-none-match") == HEALTH_ETAG:
+        return Response(status_code=304, headers=HEALTH_HEADERS)
+    return ORJSONResponse(HEALTH_BODY, headers=HEALTH_HEADERS)
 
 
 @app.post("/upload", response_model=UploadResponse)
@@ -114,28 +281,29 @@ async def upload_resume(
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
-    # Save to temp file (UploadFile is a stream, not a path)
+    # Save to temp file (UploadFile is a stream, not a path).
+    # Copied 1 MB at a time, so peak memory stays flat whatever the PDF size.
     with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        content = await file.read()
-        tmp.write(content)
+        while chunk := await file.read(UPLOAD_READ_SIZE):
+            tmp.write(chunk)
         tmp_path = tmp.name
     
     try:
-        # Clear old vectors for this namespace before re-ingesting
+        # Chunk the PDF (ValueError = no extractable text, e.g. a scanned PDF)
         try:
-            delete_namespace(namespace)
-            logger.info(f"Cleared old vectors for namespace: {namespace}")
-        except Exception:
-            pass  # Namespace may not exist yet, that's fine
-        
-        # Chunk the PDF
-        chunks = load_and_chunk(tmp_path)
+            chunks = await asyncio.to_thread(load_and_chunk, tmp_path)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
         
         if not chunks:
             raise HTTPException(status_code=422, detail="Could not extract text from PDF")
         
-        # Ingest into Pinecone
-        ingest_resume(chunks, namespace=namespace)
+        # Ingest into Pinecone — updates the namespace in place (no need to
+        # clear it first: unchanged chunks are kept, removed ones deleted)
+        await aingest_resume(chunks, namespace=namespace)
+
+        # Cached answers/stores were about the previous resume in this namespace
+        forget_namespace(namespace)
         
         return UploadResponse(
             message=f"✅ Resume '{file.filename}' ingested successfully!",
@@ -148,19 +316,57 @@ async def upload_resume(
         os.unlink(tmp_path)
 
 
+@lru_cache(maxsize=32)
+def get_chain(namespace: str):
+    """
+    Build the RAG chain for a namespace ONCE and reuse it.
+
+    The chain (Groq client, prompt, parser, retriever) holds no per-request
+    state, so rebuilding it on every question is wasted work.
+    """
+    chain, _ = build_rag_chain(get_vector_store(namespace=namespace))
+    return chain
+
+
+def forget_namespace(namespace: str) -> None:
+    """
+    Drop everything this process cached about a namespace's resume —
+    after it's re-uploaded or reset. (lru_cache can't evict one key, so the
+    store/chain caches are cleared wholesale; they rebuild on next use.)
+    """
+    semantic_cache.invalidate(namespace)
+    get_vector_store.cache_clear()
+    get_chain.cache_clear()
+
+
+async def embed_question(question: str) -> np.ndarray:
+    """Embed a question off the event loop, as a float32 vector for the cache."""
+    vector = await asyncio.to_thread(get_embeddings().embed_query, question)
+    return np.asarray(vector, dtype=np.float32)
+
+
+def sse_event(payload: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message."""
+    return f"data: {orjson.dumps(payload).decode()}\n\n"
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
     Ask a question about the uploaded resume.
     
     Steps:
-    1. Load the vector store connection for this namespace
-    2. Build the RAG chain
+    1. Embed the question and check the semantic cache
+    2. Get the (cached) RAG chain for this namespace
     3. Run the chain with the question + conversation history
     4. Return the answer + source chunks
     
-    Session history is stored in memory (sessions dict).
-    In production, persist this in Redis with TTL expiry.
+    Only standalone questions (no prior history in the session) go
+    through the semantic cache — follow-ups like "tell me more about
+    that" depend on the conversation, so the same words can need a
+    different answer.
+
+    Session history lives in the session store (Redis or in-memory).
     """
     if not request.question.strip():
         raise HTTPException(status_code=400, detail="Question cannot be empty")
@@ -168,29 +374,45 @@ async def chat(request: ChatRequest):
     try:
         # Get or initialize session
         session_key = f"{request.session_id}:{request.namespace}"
-        if session_key not in sessions:
-            sessions[session_key] = {"chat_history": []}
-        
-        chat_history = sessions[session_key]["chat_history"]
+        chat_history = await sessions.get_history(session_key)
         
-        # Load vector store and build chain
-        vector_store = get_vector_store(namespace=request.namespace)
-        chain, retriever = build_rag_chain(vector_store)
-        
-        # Run the RAG chain
-        result = ask_question(
-            chain=chain,
-            retriever=retriever,
-            question=request.question,
-            chat_history=chat_history,
-        )
+        # Embed the question once — reused for the cache AND retrieval
+        q_vec = await embed_question(request.question)
+        use_cache = not chat_history
+        # Read BEFORE answering: an answer computed while the resume is being
+        # replaced is stored under the old generation, never served as new
+        generation = namespace_generation(request.namespace)
         
-        # Update session history
-        sessions[session_key]["chat_history"] = result["chat_history"]
+        cached = semantic_cache.lookup(request.namespace, generation, q_vec) if use_cache else None
+        if cached is not None:
+            answer, sources = cached
+            logger.info(f"Semantic cache hit for namespace: {request.namespace}")
+            await sessions.save_history(
+                session_key, extend_history(chat_history, request.question, answer)
+            )
+        else:
+            # Off the loop: a cache miss loads the sidecar or connects to Pinecone
+            chain = await asyncio.to_thread(get_chain, request.namespace)
+            
+            # Run the RAG chain
+            result = await asyncio.to_thread(
+                ask_question,
+                chain=chain,
+                question=request.question,
+                chat_history=chat_history,
+                query_vector=q_vec.tolist(),
+            )
+            answer, sources = result["answer"], result["sources"]
+            
+            # Update session history
+            await sessions.save_history(session_key, result["chat_history"])
+            
+            if use_cache:
+                semantic_cache.add(request.namespace, generation, q_vec, answer, sources)
         
         return ChatResponse(
-            answer=result["answer"],
-            sources=[SourceDocument(**s) for s in result["sources"]],
+            answer=answer,
+            sources=[SourceDocument(**s) for s in sources],
             session_id=request.session_id,
         )
     
@@ -199,6 +421,68 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
 
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Same as /chat, but streams the answer as Server-Sent Events so the UI
+    can render tokens as Groq generates them (time-to-first-token instead
+    of time-to-full-answer).
+
+    Events (one JSON object per "data:" line):
+      {"token": "..."}        → next piece of the answer (repeated)
+      {"sources": [...]}      → source citations, sent last
+      {"error": "..."}        → something failed mid-stream
+    """
+    if not request.question.strip():
+        raise HTTPException(status_code=400, detail="Question cannot be empty")
+    
+    session_key = f"{request.session_id}:{request.namespace}"
+    chat_history = await sessions.get_history(session_key)
+    
+    q_vec = await embed_question(request.question)
+    use_cache = not chat_history
+    generation = namespace_generation(request.namespace)
+    cached = semantic_cache.lookup(request.namespace, generation, q_vec) if use_cache else None
+    
+    async def event_stream():
+        if cached is not None:
+            answer, sources = cached
+            logger.info(f"Semantic cache hit for namespace: {request.namespace}")
+            await sessions.save_history(
+                session_key, extend_history(chat_history, request.question, answer)
+            )
+            yield sse_event({"token": answer})
+            yield sse_event({"sources": sources})
+            return
+        
+        try:
+            chain = await asyncio.to_thread(get_chain, request.namespace)
+            
+            result = None
+            async for event in astream_question(
+                chain=chain,
+                question=request.question,
+                chat_history=chat_history,
+                query_vector=q_vec.tolist(),
+            ):
+                if "token" in event:
+                    yield sse_event({"token": event["token"]})
+                else:
+                    result = event
+            
+            await sessions.save_history(session_key, result["chat_history"])
+            if use_cache:
+                semantic_cache.add(request.namespace, generation, q_vec, result["answer"], result["sources"])
+            
+            yield sse_event({"sources": result["sources"]})
+        
+        except Exception as e:
+            logger.error(f"Chat stream error: {str(e)}", exc_info=True)
+            yield sse_event({"error": f"Error processing question: {str(e)}"})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.delete("/reset/{namespace}")
 async def reset_resume(namespace: str):
     """
@@ -206,11 +490,10 @@ async def reset_resume(namespace: str):
     Useful for replacing a resume without creating duplicates.
     """
     try:
-        delete_namespace(namespace)
+        await asyncio.to_thread(delete_namespace, namespace)
+        forget_namespace(namespace)
         # Also clear session history for this namespace
-        keys_to_delete = [k for k in sessions if k.endswith(f":{namespace}")]
-        for k in keys_to_delete:
-            del sessions[k]
+        await sessions.delete_namespace(namespace)
         return {"message": f"✅ Namespace '{namespace}' cleared successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -223,7 +506,14 @@ if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
         "api:app",
-        host=os.getenv("FASTAPI_HOST", "localhost"),
-        port=int(os.getenv("FASTAPI_PORT", 8000)),
-        reload=True  # auto-reload on code changes during dev
+        host=getenv("FASTAPI_HOST", "localhost"),
+        port=int(getenv("FASTAPI_PORT", "8000")),
+        # uvloop (libuv event loop) + httptools (C HTTP parser) instead of
+        # the pure-Python asyncio + h11 defaults. uvloop isn't available on Windows.
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=int(getenv("WORKERS", "4")),
+        # Auto-reload during dev (RELOAD=true) runs a single process —
+        # uvicorn ignores `workers` when reload is on
+        reload=getenv("RELOAD", "false").lower() == "true",
     )
\ No newline at end of file
@@ -12,6 +12,8 @@ A clean, professional UI that:
 
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+import json
 import uuid
 import time
 import os
@@ -200,14 +202,24 @@ if "namespace" not in st.session_state:
 if "resume_name" not in st.session_state:
     st.session_state.resume_name = None
 
+# One pooled HTTP session per browser session — Streamlit reruns the script
+# on every interaction, and this keeps connections to the API alive
+# instead of opening a new one per request.
+if "http" not in st.session_state:
+    st.session_state.http = requests.Session()
+    st.session_state.http.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+
 
 # ─────────────────────────────────────────────
 # Helper functions
 # ─────────────────────────────────────────────
+@st.cache_data(ttl=15)
 def check_api_health() -> bool:
+    # Cached for 15s (matches the API's Cache-Control) so sidebar reruns
+    # don't ping the API on every click
     try:
-        r = requests.get(f"{API_URL}/health", timeout=3)
-        return r.status_code == 200
+        r = st.session_state.http.get(f"{API_URL}/health", timeout=3)
+        return r.status_code in (200, 304)
     except Exception:
         return False
 
@@ -215,20 +227,33 @@ def check_api_health() -> bool:
 def upload_resume(file, namespace: str) -> dict:
     files = {"file": (file.name, file.getvalue(), "application/pdf")}
     params = {"namespace": namespace}
-    response = requests.post(f"{API_URL}/upload", files=files, params=params, timeout=120)
+    response = st.session_state.http.post(f"{API_URL}/upload", files=files, params=params, timeout=120)
     response.raise_for_status()
     return response.json()
 
 
-def ask_question(question: str) -> dict:
+def stream_answer(question: str, sources: list):
+    """
+    Yield answer tokens from /chat/stream as they arrive.
+    The final "sources" event is appended to the given list.
+    """
     payload = {
         "question": question,
         "session_id": st.session_state.session_id,
         "namespace": st.session_state.namespace,
     }
-    response = requests.post(f"{API_URL}/chat", json=payload, timeout=60)
-    response.raise_for_status()
-    return response.json()
+    with st.session_state.http.post(f"{API_URL}/chat/stream", json=payload, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if "error" in event:
+                raise RuntimeError(event["error"])
+            if "token" in event:
+                yield event["token"]
+            if "sources" in event:
+                sources.extend(event["sources"])
 
 
 # ─────────────────────────────────────────────
@@ -400,13 +425,24 @@ else:
         # Add human message immediately
         st.session_state.messages.append({"role": "human", "content": question})
         
-        with st.spinner("Searching resume & generating answer..."):
+        with chat_container:
+            st.markdown(f"""
+            <div class="message-human">
+                <div class="message-label">You</div>
+                {question}
+            </div>
+            """, unsafe_allow_html=True)
+            st.markdown('<div class="message-label">🤖 AI Assistant</div>', unsafe_allow_html=True)
+            
+            # Render tokens as they stream in; the full message is
+            # re-rendered in the styled bubble after st.rerun()
+            sources = []
             try:
-                result = ask_question(question)
+                answer = st.write_stream(stream_answer(question, sources))
                 st.session_state.messages.append({
                     "role": "ai",
-                    "content": result["answer"],
-                    "sources": result["sources"],
+                    "content": answer,
+                    "sources": sources,
                 })
             except Exception as e:
                 st.session_state.messages.append({
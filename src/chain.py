@@ -28,21 +28,53 @@ just the question string before it reaches the retriever.
 from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.schema.output_parser import StrOutputParser
-from langchain.schema.runnable import RunnableLambda
-from langchain.schema import HumanMessage, AIMessage
+from langchain.schema.runnable import RunnableLambda, RunnableParallel, RunnablePassthrough
+from langchain.schema import HumanMessage, AIMessage, BaseMessage
 from langchain_pinecone import PineconeVectorStore
-from typing import List, Dict, Any
+from src.reranker import rerank
+from src.env import getenv
+from typing import List, Dict, Any, Optional, AsyncIterator
+from functools import lru_cache
 import logging
-import os
+import httpx
 
 logger = logging.getLogger(__name__)
 
+FETCH_K = 20  # candidates pulled from Pinecone
+TOP_K = 4     # chunks kept after reranking (what the LLM sees)
+SOURCE_PREVIEW_CHARS = 400  # citation text sent to the UI (it shows 300)
+
+# Connection pool shared by every Groq request in this process
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+HTTP_TIMEOUT = 30.0
+
+
+# ─────────────────────────────────────────────
+# SHARED HTTP CLIENTS
+# ─────────────────────────────────────────────
+# One sync + one async httpx client per process, passed to every ChatGroq
+# we build (one per namespace, see api.py). Connections stay open between
+# questions — no new TCP/TLS handshake per request — and http2=True lets
+# concurrent requests share a single connection.
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    return httpx.Client(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
+
+@lru_cache(maxsize=1)
+def get_async_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
 
 # ─────────────────────────────────────────────
 # PROMPT TEMPLATE
 # ─────────────────────────────────────────────
+# The system prompt is STATIC — no template slots. Retrieved resume
+# sections go into the final human message instead, so the leading
+# tokens of every request are byte-identical and the LLM provider's
+# automatic prefix cache can reuse them across questions.
 SYSTEM_PROMPT = """You are an expert AI assistant that answers questions about a candidate's resume.
-You have access to the resume content below. Answer questions accurately and helpfully.
+Each question comes with the relevant resume excerpts. Answer questions accurately and helpfully.
 
 Guidelines:
 - Be specific and cite details from the resume when possible
@@ -50,12 +82,12 @@ Guidelines:
 - If the resume doesn't contain the answer, say "This information isn't in the resume"
 - Keep answers concise but thorough
 - Speak as if you are a helpful recruiter who knows this candidate well
+"""
 
-Resume Content (retrieved relevant sections):
+QUESTION_TEMPLATE = """Resume excerpts (retrieved relevant sections):
 {context}
-"""
 
-QUESTION_TEMPLATE = """Based on the resume information above, please answer this question:
+Based on the resume information above, please answer this question:
 {question}"""
 
 
@@ -67,12 +99,35 @@ def format_docs(docs) -> str:
     if not docs:
         return "No relevant sections found in the resume."
 
-    formatted = []
-    for i, doc in enumerate(docs, 1):
-        page = doc.metadata.get("page", "?")
-        formatted.append(f"[Section {i} - Page {page}]\n{doc.page_content}")
+    # Single generator pass — no intermediate list of section strings
+    return "\n\n---\n\n".join(
+        f"[Section {i} - Page {doc.metadata.get('page', '?')}]\n{doc.page_content}"
+        for i, doc in enumerate(docs, 1)
+    )
+
+
+def retrieve_docs(retriever, question: str, query_vector: Optional[List[float]] = None):
+    """
+    Fetch the best TOP_K resume chunks for a question.
+
+    The retriever returns FETCH_K candidates by vector similarity; the
+    cross-encoder (reranker.py) then keeps the TOP_K most relevant.
 
-    return "\n\n---\n\n".join(formatted)
+    If the caller already embedded the question (e.g. for the semantic
+    cache in api.py), pass it as query_vector — we then search Pinecone
+    by vector directly instead of embedding the same question again.
+    (Through the *_with_score method: langchain-pinecone 0.1.3's
+    PineconeVectorStore doesn't implement similarity_search_by_vector.)
+    """
+    if query_vector is None:
+        candidates = retriever.invoke(question)
+    else:
+        candidates = [
+            doc for doc, _ in retriever.vectorstore.similarity_search_by_vector_with_score(
+                query_vector, **retriever.search_kwargs
+            )
+        ]
+    return rerank(question, candidates, top_n=TOP_K)
 
 
 def build_rag_chain(vector_store: PineconeVectorStore):
@@ -83,34 +138,41 @@ def build_rag_chain(vector_store: PineconeVectorStore):
     ┌─────────────────────────────────────────────────────┐
     │ Input dict: {"question": str, "chat_history": [...]} │
     │    ↓                                                 │
-    │ Extract question string (RunnableLambda)             │
-    │    ↓                                                 │
-    │ Retriever → search Pinecone → top 4 chunks          │
+    │ assign(docs): Retriever → Pinecone top 20 → rerank  │
+    │               (cross-encoder) → top 4               │
     │    ↓                                                 │
-    │ format_docs() → combine chunks into context string  │
+    │ assign(context): format_docs(docs) → context string │
     │    ↓                                                 │
-    │ ChatPromptTemplate → fill {context}, {question}     │
+    │ ┌── answer: ChatPromptTemplate → fill {context},    │
+    │ │           {question} → ChatGroq (LLaMA-3.3 70B)   │
+    │ │           → StrOutputParser → plain string        │
+    │ └── docs:   passed through for source citations     │
     │    ↓                                                 │
-    │ ChatGroq (LLaMA-3.3 70B) → generate response       │
-    │    ↓                                                 │
-    │ StrOutputParser → return plain string               │
+    │ Output dict: {"answer": str, "docs": [Document]}    │
     └─────────────────────────────────────────────────────┘
 
+    Pinecone is queried ONCE per question: the same docs feed both the
+    prompt context and the citations returned to the UI.
+
     KEY FIX: The retriever receives x["question"] (a string), NOT the
     full dict. HuggingFace embeddings crash if given a dict.
     """
 
-    # RETRIEVER: search Pinecone for top-k similar chunks
+    # RETRIEVER: search Pinecone for FETCH_K candidate chunks
+    # (narrowed down to TOP_K by the reranker in retrieve_docs)
     retriever = vector_store.as_retriever(
         search_type="similarity",
-        search_kwargs={"k": 4}
+        search_kwargs={"k": FETCH_K}
     )
 
     # LLM: Groq runs LLaMA-3.3 70B — free and very fast
+    # (over the shared, keep-alive HTTP/2 clients above)
     llm = ChatGroq(
         model="llama-3.3-70b-versatile",
         temperature=0,
-        groq_api_key=os.getenv("GROQ_API_KEY"),
+        groq_api_key=getenv("GROQ_API_KEY"),
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
     )
 
     # PROMPT
@@ -128,33 +190,67 @@ def build_rag_chain(vector_store: PineconeVectorStore):
     #   {"question": "What skills does he have?", "chat_history": [...]}
     #
     # The retriever needs ONLY the question string — not the whole dict.
-    # We use RunnableLambda(lambda x: x["question"]) to extract it.
+    # We use RunnableLambda(lambda x: ... x["question"] ...) to extract it.
     # Without this, HuggingFace's embed_query() receives a dict and crashes
     # with: AttributeError: 'dict' object has no attribute 'replace'
     # ─────────────────────────────────────────────────────────────────────
     chain = (
-        {
-            "context": RunnableLambda(lambda x: x["question"]) | retriever | RunnableLambda(format_docs),
-            "question": RunnableLambda(lambda x: x["question"]),
-            "chat_history": RunnableLambda(lambda x: x.get("chat_history", [])),
-        }
-        | prompt
-        | llm
-        | parser
+        RunnablePassthrough.assign(
+            docs=RunnableLambda(
+                lambda x: retrieve_docs(retriever, x["question"], x.get("query_vector"))
+            )
+        )
+        | RunnablePassthrough.assign(context=RunnableLambda(lambda x: format_docs(x["docs"])))
+        | RunnableParallel(
+            answer=prompt | llm | parser,
+            docs=RunnableLambda(lambda x: x["docs"]),
+        )
     )
 
     return chain, retriever
 
 
+def to_sources(docs) -> List[Dict[str, Any]]:
+    """
+    Turn retrieved Documents into the {"text", "page"} citations the UI shows.
+
+    Text is cut to SOURCE_PREVIEW_CHARS here, before it goes over the wire —
+    the UI only displays a short preview of each section anyway.
+    The page is cast to int: Pinecone returns metadata numbers as floats.
+    """
+    return [
+        {
+            "text": doc.page_content[:SOURCE_PREVIEW_CHARS],
+            "page": int(doc.metadata.get("page", 0)),
+        }
+        for doc in docs
+    ]
+
+
+def extend_history(
+    chat_history: List[BaseMessage],
+    question: str,
+    answer: str,
+) -> List[BaseMessage]:
+    """Return the conversation history with one more question/answer turn."""
+    return chat_history + [HumanMessage(content=question), AIMessage(content=answer)]
+
+
 def ask_question(
     chain,
-    retriever,
     question: str,
-    chat_history: List[Dict[str, str]] = None
+    chat_history: List[BaseMessage] = None,
+    query_vector: Optional[List[float]] = None,
 ) -> Dict[str, Any]:
     """
     Ask a question and get an answer with source chunks.
 
+    chat_history: LangChain message objects (HumanMessage / AIMessage),
+    passed to the prompt as-is — no per-turn conversion.
+
+    query_vector: optional precomputed embedding of the question, used
+    to skip re-embedding it during retrieval.
+
     Returns:
     {
         "answer": "John has 5 years of Python experience at...",
@@ -165,38 +261,57 @@ def ask_question(
     if chat_history is None:
         chat_history = []
 
-    # Convert history dicts to LangChain message objects
-    lc_history = []
-    for msg in chat_history:
-        if msg["role"] == "human":
-            lc_history.append(HumanMessage(content=msg["content"]))
-        elif msg["role"] == "ai":
-            lc_history.append(AIMessage(content=msg["content"]))
-
-    # Run the chain — input is a clean dict with string question
-    answer = chain.invoke({
+    # Run the chain — input is a clean dict with string question.
+    # The chain returns the answer AND the docs it retrieved, so the
+    # citations come from the same single Pinecone query.
+    result = chain.invoke({
         "question": question,        # ← plain string, extracted in chain
-        "chat_history": lc_history,
+        "chat_history": chat_history,
+        "query_vector": query_vector,
     })
+    answer = result["answer"]
 
-    # Retrieve sources separately to show citations in UI
-    source_docs = retriever.invoke(question)
-    sources = [
-        {
-            "text": doc.page_content,
-            "page": doc.metadata.get("page", 0),
-        }
-        for doc in source_docs
-    ]
+    return {
+        "answer": answer,
+        "sources": to_sources(result["docs"]),
+        "chat_history": extend_history(chat_history, question, answer),
+    }
 
-    # Update conversation history for next turn
-    updated_history = chat_history + [
-        {"role": "human", "content": question},
-        {"role": "ai", "content": answer},
-    ]
 
-    return {
+async def astream_question(
+    chain,
+    question: str,
+    chat_history: List[BaseMessage] = None,
+    query_vector: Optional[List[float]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming version of ask_question().
+
+    Yields {"token": "..."} for each piece of the answer as Groq generates
+    it, then ONE final dict shaped exactly like ask_question()'s result
+    (answer, sources, chat_history) once generation is complete.
+    """
+    if chat_history is None:
+        chat_history = []
+
+    tokens = []
+    docs = []
+    async for chunk in chain.astream({
+        "question": question,
+        "chat_history": chat_history,
+        "query_vector": query_vector,
+    }):
+        # RunnableParallel streams each branch separately:
+        # {"docs": [...]} arrives once, {"answer": "..."} once per token
+        if "docs" in chunk:
+            docs = chunk["docs"]
+        if chunk.get("answer"):
+            tokens.append(chunk["answer"])
+            yield {"token": chunk["answer"]}
+
+    answer = "".join(tokens)
+    yield {
         "answer": answer,
-        "sources": sources,
-        "chat_history": updated_history,
+        "sources": to_sources(docs),
+        "chat_history": extend_history(chat_history, question, answer),
     }
\ No newline at end of file
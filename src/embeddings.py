@@ -17,30 +17,147 @@ We use HuggingFace's sentence-transformers — 100% FREE, runs locally:
   - Downloads once (~90MB), then cached locally
   - Great quality for RAG/semantic search
 
+CONCEPT: ONNX Runtime + INT8 Quantization
+------------------------------------------
+Instead of running the model through PyTorch, we export it ONCE to ONNX
+and quantize its weights from FP32 to INT8 (dynamic quantization):
+  - 4× less weight memory to stream through the CPU per forward pass
+  - int8 matmuls use the CPU's dot-product instructions (e.g. AVX-512 VNNI)
+  - no PyTorch/Python overhead per call — a single ONNX Runtime session.run()
+Same 384-dim output, typically 3-5× faster on CPU. The quantized model
+is written to ONNX_MODEL_DIR on first run and loaded from there afterwards.
+
 NOTE: Because we changed from OpenAI (1536 dims) to HuggingFace (384 dims),
-you MUST set dimension=384 in your Pinecone index.
-If you have an old index with 1536 dims, delete it and create a new one!
+the Pinecone index must use dimension=384 (ensure_index_exists creates it
+with EMBEDDING_DIMENSION). If you have an old index with 1536 dims, delete
+it and create a new one!
 
 The vector DB uses these numbers to find "nearest neighbors" —
 chunks whose meaning is closest to your question.
 """
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from transformers import AutoTokenizer
+from functools import lru_cache
+from typing import List
+import onnxruntime as ort
+import numpy as np
+import threading
+import logging
+import os
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 # Embedding model name — this will be downloaded from HuggingFace Hub
 # on first run and cached at ~/.cache/huggingface/
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 EMBEDDING_DIMENSION = 384  # ⚠️ Pinecone index must use this dimension!
+MAX_SEQ_LENGTH = 256       # all-MiniLM-L6-v2 was trained with 256-token inputs
+
+# Local cache for derived artifacts (ONNX model, per-resume vectors, ...)
+CACHE_DIR = os.path.expanduser("~/.cache/resume-chat")
+
+# Where the exported + INT8-quantized ONNX model lives
+ONNX_MODEL_DIR = os.path.join(CACHE_DIR, "onnx-minilm-int8")
+ONNX_MODEL_FILE = "model_quantized.onnx"
 
+# Persistent text → vector cache used during ingestion
+EMBEDDING_CACHE_DIR = os.path.join(CACHE_DIR, "embeddings")
+EMBEDDING_CACHE_NAMESPACE = "minilm-l6-v2-onnx-int8-"  # change if the model changes
 
-def get_embeddings() -> HuggingFaceEmbeddings:
+
+def export_quantized_model(model_dir: str = ONNX_MODEL_DIR) -> None:
     """
-    Returns a HuggingFace sentence-transformer embeddings instance.
+    One-time setup: export all-MiniLM-L6-v2 to ONNX and quantize it to INT8.
+
+    Uses HuggingFace Optimum:
+    1. ORTModelForFeatureExtraction(export=True) → FP32 ONNX graph
+    2. ORTQuantizer + avx512_vnni config → dynamic INT8 weights, per-channel
+    """
+    # Imported here: only needed the first time, and pulls in PyTorch
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    logger.info(f"Exporting {EMBEDDING_MODEL} to INT8 ONNX at {model_dir}")
+    model = ORTModelForFeatureExtraction.from_pretrained(
+        EMBEDDING_MODEL, export=True, provider="CPUExecutionProvider"
+    )
+    model.save_pretrained(model_dir)
+    AutoTokenizer.from_pretrained(EMBEDDING_MODEL).save_pretrained(model_dir)
+
+    quantizer = ORTQuantizer.from_pretrained(model)
+    qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=True)
+    quantizer.quantize(save_dir=model_dir, quantization_config=qconfig)
+
+
+class OnnxMiniLMEmbeddings(Embeddings):
+    """
+    all-MiniLM-L6-v2 on ONNX Runtime (INT8), as a LangChain Embeddings object.
+
+    Pipeline per batch (same math as sentence-transformers):
+      tokenize → session.run() → mean-pool over real tokens → L2 normalize
+
+    Vectors are L2-normalized, so a dot product IS the cosine similarity.
+    """
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, batch_size: int = 64):
+        if not os.path.exists(os.path.join(model_dir, ONNX_MODEL_FILE)):
+            export_quantized_model(model_dir)
+
+        self.batch_size = batch_size
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, ONNX_MODEL_FILE),
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        # Fast tokenizers aren't safe to call from several threads at once
+        # (requests are embedded in worker threads), session.run() is.
+        self._tokenizer_lock = threading.Lock()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into a (len(texts), 384) float32 matrix."""
+        vectors = np.empty((len(texts), EMBEDDING_DIMENSION), dtype=np.float32)
+
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            with self._tokenizer_lock:
+                encoded = self.tokenizer(
+                    batch, padding=True, truncation=True,
+                    max_length=MAX_SEQ_LENGTH, return_tensors="np",
+                )
+            inputs = {k: v.astype(np.int64) for k, v in encoded.items() if k in self.input_names}
+            token_embeddings = self.session.run(None, inputs)[0]  # (B, T, 384)
+
+            # Mean pooling: average token vectors, ignoring padding
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+            # L2 normalize so cosine similarity == dot product
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            vectors[start:start + len(batch)] = pooled / np.clip(norms, 1e-12, None)
+
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> Embeddings:
+    """
+    Returns the all-MiniLM-L6-v2 embeddings instance (INT8, ONNX Runtime).
     COMPLETELY FREE — runs locally on your machine.
 
+    Cached: the model is loaded from disk once per process and the same
+    ONNX Runtime session is shared by every request.
+
     This object is used by LangChain in two places:
     1. During INGESTION: embed each chunk before storing in Pinecone
     2. During RETRIEVAL: embed the user's question before searching Pinecone
@@ -48,11 +165,25 @@ def get_embeddings() -> HuggingFaceEmbeddings:
     Using the SAME model for both is critical — different models produce
     vectors in different "spaces" that can't be compared.
 
-    model_kwargs: {"device": "cpu"} — use CPU (works on any machine)
-    encode_kwargs: {"normalize_embeddings": True} — normalize for cosine similarity
+    batch_size=64 — sentences per ONNX forward pass
+    Output is always L2-normalized for cosine similarity.
+    """
+    return OnnxMiniLMEmbeddings(batch_size=64)
+
+
+@lru_cache(maxsize=1)
+def get_cached_embeddings() -> Embeddings:
+    """
+    get_embeddings() with a persistent on-disk cache for embed_documents().
+
+    Used at INGESTION: every chunk's vector is stored under a hash of its
+    text, so re-uploading a resume (or one that shares chunks with an
+    earlier upload) only runs the model on text it has never seen.
+
+    Queries are not cached — embed_query() goes straight to the model.
     """
-    return HuggingFaceEmbeddings(
-        model_name=EMBEDDING_MODEL,
-        model_kwargs={"device": "cpu"},
-        encode_kwargs={"normalize_embeddings": True},
-    )
\ No newline at end of file
+    return CacheBackedEmbeddings.from_bytes_store(
+        get_embeddings(),
+        LocalFileStore(EMBEDDING_CACHE_DIR),
+        namespace=EMBEDDING_CACHE_NAMESPACE,
+    )
@@ -0,0 +1,30 @@
+"""
+env.py
+======
+Settings (API keys, index name, Redis URL, ...) come from environment
+variables, optionally set in a .env file.
+
+The .env file is read LAZILY — the first time a setting is looked up,
+not as a side effect of importing a module — and only once per process.
+Importing src.* (e.g. from tests or a script) does no file I/O.
+
+Variables already set in the real environment win: load_dotenv() never
+overrides them.
+"""
+
+from dotenv import load_dotenv
+from functools import lru_cache
+from typing import Optional
+import os
+
+
+@lru_cache(maxsize=1)
+def load_env() -> None:
+    """Read .env into os.environ — once; later calls are free."""
+    load_dotenv()
+
+
+def getenv(key: str, default: Optional[str] = None) -> Optional[str]:
+    """os.getenv(), after making sure .env has been loaded."""
+    load_env()
+    return os.getenv(key, default)
@@ -16,78 +16,355 @@ WHY OVERLAP?
 - If a sentence spans two chunks, overlap ensures context isn't lost
 - e.g., chunk_size=500, chunk_overlap=100 means each chunk shares
   100 characters with the next one
+
+CACHING:
+The same resume is often uploaded more than once. Chunks are cached on
+disk keyed by the SHA-256 of the PDF's bytes, so an identical file skips
+PDF parsing and splitting entirely.
 """
 
-from langchain_community.document_loaders import PyPDFLoader, PDFPlumberLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.document_loaders import PDFPlumberLoader
+from pypdf import PdfReader
 from langchain.schema import Document
-from typing import List
+from src.embeddings import CACHE_DIR
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+import hashlib
 import logging
+import math
+import os
+import pickle
+import re
+import unicodedata
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 500       # ~125 tokens per chunk
+CHUNK_OVERLAP = 100    # overlap to preserve context at boundaries
+MIN_CHUNK_SIZE = 400   # ~100 tokens — shorter chunks get merged into a neighbor...
+MAX_MERGED_CHUNK_SIZE = 1150  # ...as long as the merged chunk stays within this
 
-def load_pdf(file_path: str) -> List[Document]:
+# PDFs with at least this many pages are extracted in parallel
+PARALLEL_PAGE_THRESHOLD = 4
+PDF_WORKERS = min(4, os.cpu_count() or 1)
+# Less text than this from pypdf (whole file) → retry with pdfplumber
+MIN_PDF_TEXT_CHARS = 200
+
+# Paragraph breaks, line breaks, or any other run of whitespace
+_SEPARATOR_RE = re.compile(r"(\n\n+|\n|\s+)")
+# A hyphenated word wrapped at a line break: "cross-\nfunctional"
+_HYPHEN_BREAK_RE = re.compile(r"(\w-)[ \t]*\n\s*(?=[a-z])")
+# A soft hyphen (U+00AD), plus the line break it was wrapped at, if any
+_SOFT_HYPHEN_RE = re.compile(r"\u00ad(?:[ \t]*\n\s*)?")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+CHUNK_CACHE_DIR = os.path.join(CACHE_DIR, "chunks")
+# Bump whenever loading/chunking logic changes, so stale cached chunks are ignored
+CHUNK_CACHE_VERSION = 6
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) with a reader of its own."""
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _iter_pypdf_pages(file_path: str) -> Iterator[Document]:
+    """
+    Yield a PDF's pages one at a time, in order, extracted with pypdf.
+
+    We use pypdf directly (what PyPDFLoader wraps). Short PDFs — most
+    resumes — are read page by page. Longer ones are split into page
+    ranges extracted in parallel threads, each with its own PdfReader
+    (one reader must never be shared across threads); ranges are yielded
+    as soon as they're ready, in page order.
+    """
+    reader = PdfReader(file_path)
+    num_pages = len(reader.pages)
+    
+    if num_pages < PARALLEL_PAGE_THRESHOLD:
+        # Not worth the thread pool startup
+        texts = (page.extract_text() or "" for page in reader.pages)
+        for i, text in enumerate(texts):
+            yield Document(page_content=text, metadata={"source": file_path, "page": i})
+    else:
+        step = math.ceil(num_pages / PDF_WORKERS)
+        with ThreadPoolExecutor(max_workers=PDF_WORKERS) as executor:
+            ranges = executor.map(
+                lambda start: _extract_page_range(file_path, start, min(start + step, num_pages)),
+                range(0, num_pages, step),
+            )
+            i = 0
+            for page_texts in ranges:
+                for text in page_texts:
+                    yield Document(page_content=text, metadata={"source": file_path, "page": i})
+                    i += 1
+    
+    logger.info(f"Loaded {num_pages} pages from PDF")
+
+
+def iter_pages(file_path: str) -> Iterator[Document]:
     """
-    Load a PDF and return a list of LangChain Document objects.
+    Yield a PDF's pages one at a time, in order, as LangChain Documents.
     Each Document has:
       - page_content: the raw text
       - metadata: {"source": "path/to/file.pdf", "page": 0}
+
+    TIERED EXTRACTION:
+    1. pypdf (fast) — works for almost every resume
+    2. pdfplumber (slower, layout-aware) — only if pypdf found less than
+       MIN_PDF_TEXT_CHARS characters of text in the whole file
+    3. still no text → ValueError: most likely a scanned (image-only)
+       PDF, and we don't do OCR. Better to fail clearly than to embed
+       empty chunks.
+
+    A generator: once pypdf has produced MIN_PDF_TEXT_CHARS of text, the
+    pages seen so far are released and the rest stream straight through,
+    so chunk_documents() can split page 1 while later pages are extracted.
     """
     logger.info(f"Loading PDF from: {file_path}")
     
-    # PyPDFLoader is simple and reliable for most resumes
-    loader = PyPDFLoader(file_path)
-    documents = loader.load()
+    pages = _iter_pypdf_pages(file_path)
+    buffered = []
+    text_chars = 0
+    for page in pages:
+        buffered.append(page)
+        text_chars += len(page.page_content.strip())
+        if text_chars >= MIN_PDF_TEXT_CHARS:
+            yield from buffered
+            yield from pages
+            return
     
-    logger.info(f"Loaded {len(documents)} pages from PDF")
-    return documents
+    logger.info(f"pypdf found only {text_chars} chars of text, trying pdfplumber")
+    plumber_pages = [
+        Document(page_content=doc.page_content, metadata={"source": file_path, "page": i})
+        for i, doc in enumerate(PDFPlumberLoader(file_path).load())
+    ]
+    if sum(len(doc.page_content.strip()) for doc in plumber_pages) > text_chars:
+        buffered = plumber_pages
+    
+    if not any(doc.page_content.strip() for doc in buffered):
+        raise ValueError(
+            "No text could be extracted from this PDF — it looks like a scanned "
+            "image. Please upload a PDF with selectable text."
+        )
+    yield from buffered
+
+
+def load_pdf(file_path: str) -> List[Document]:
+    """All of a PDF's pages as a list — see iter_pages()."""
+    return list(iter_pages(file_path))
+
+
+def normalize_text(text: str) -> str:
+    """
+    Clean up PDF text extraction artifacts before splitting.
+
+    - NFKC: ligatures and other compatibility characters become plain
+      text ("ﬁ" → "fi", "ﬀ" → "ff", full-width letters → ASCII)
+    - soft hyphens (U+00AD) mark a word split only to wrap it: they're
+      dropped, along with the line break after them ("engi" + U+00AD +
+      line break + "neering" → "engineering")
+    - words with a real hyphen wrapped at a line break are rejoined,
+      keeping the hyphen ("cross-" + line break + "functional" →
+      "cross-functional"; resumes are full of compounds like that).
+      Only before a lowercase letter, so "Python-" + line break +
+      "Django" stays.
+
+    Line breaks are kept — split_text() uses them as separators. Other
+    whitespace is collapsed per chunk in chunk_documents().
+    """
+    text = _SOFT_HYPHEN_RE.sub("", unicodedata.normalize("NFKC", text))
+    return _HYPHEN_BREAK_RE.sub(r"\1", text)
+
+
+def split_text(
+    text: str,
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP,
+    min_chunk_size: int = MIN_CHUNK_SIZE,
+    max_merged_size: int = MAX_MERGED_CHUNK_SIZE,
+) -> List[str]:
+    """
+    Split text into ~chunk_size character chunks with ~chunk_overlap overlap.
 
+    SPLIT-THEN-MERGE (one linear pass instead of recursive re-scanning):
+    1. SPLIT: one compiled regex cuts the text into words and the
+       whitespace/newlines between them — never splitting mid-word
+       (a single "word" longer than chunk_size is cut into slices)
+    2. MERGE: greedily pack consecutive pieces into a chunk until the next
+       one wouldn't fit; the next chunk starts from the pieces in the last
+       chunk_overlap characters, so context carries across the boundary
+    3. TINY-CHUNK FIX: a leftover chunk shorter than min_chunk_size (e.g.
+       the last few words of a page) is folded into the previous chunk
+       instead of wasting an embedding and a retrieval slot on its own —
+       unless that would make it longer than max_merged_size
 
-def chunk_documents(documents: List[Document]) -> List[Document]:
+    Everything works on (start, end) offsets into the original text, so
+    merging chunks never duplicates the overlapping part.
+    """
+    # 1. SPLIT → (start, end) of every word / separator
+    pieces = []
+    pos = 0
+    for part in _SEPARATOR_RE.split(text):
+        end = pos + len(part)
+        for start in range(pos, end, chunk_size):  # oversized re-split
+            pieces.append((start, min(start + chunk_size, end)))
+        pos = end
+
+    # 2. MERGE → greedy packing with overlap
+    spans = []
+    first = 0
+    while first < len(pieces):
+        last = first
+        while last + 1 < len(pieces) and pieces[last + 1][1] - pieces[first][0] <= chunk_size:
+            last += 1
+        spans.append((pieces[first][0], pieces[last][1]))
+        if last + 1 >= len(pieces):
+            break
+        # Step back over the pieces that fit in the overlap window
+        # (always moving forward at least one piece)
+        next_first = last + 1
+        while next_first - 1 > first and pieces[last][1] - pieces[next_first - 1][0] <= chunk_overlap:
+            next_first -= 1
+        first = next_first
+
+    # 3. TINY-CHUNK FIX → fold short leftovers into the previous chunk
+    merged = []
+    for start, end in spans:
+        if not text[start:end].strip():
+            continue
+        if (merged and len(text[start:end].strip()) < min_chunk_size
+                and end - merged[-1][0] <= max_merged_size):
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+    return [text[start:end].strip() for start, end in merged]
+
+
+def chunk_documents(documents: Iterable[Document]) -> Iterator[Document]:
     """
     Split documents into smaller chunks for better retrieval.
     
-    RecursiveCharacterTextSplitter tries to split on:
-    1. Double newlines (paragraphs) first
-    2. Single newlines
-    3. Spaces
-    4. Individual characters (last resort)
+    Takes any iterable of pages (e.g. the iter_pages() generator) and
+    yields chunks as each page is split — nothing is materialized here.
+    
+    split_text() breaks on paragraph breaks, newlines and spaces (never
+    mid-word), packing as much text as fits into each chunk.
+    
+    Each page is cleaned up first (normalize_text), and every chunk's
+    whitespace — runs of spaces, newlines, form feeds — is collapsed to
+    single spaces: it carries no meaning for the embedding model, only
+    extra tokens.
+    
+    Parameters (module constants):
+    - CHUNK_SIZE: max characters per chunk (~125 tokens at ~4 chars/token)
+    - CHUNK_OVERLAP: shared characters between consecutive chunks
+    - MIN_CHUNK_SIZE: shorter chunks are merged into a neighbor
+    - MAX_MERGED_CHUNK_SIZE: ...if the result stays within this size
     
-    This keeps semantically related text together.
+    split_text() merges short chunks within a page. Here we also merge
+    ACROSS pages: a page that yields one short chunk (a lone "References"
+    or a date line) is appended to the previous page's last chunk, or
+    the next page's first chunk is appended to it. Each chunk is held
+    back until we know the next one won't merge into it.
     
-    Parameters:
-    - chunk_size: max characters per chunk (~125 tokens at ~4 chars/token)
-    - chunk_overlap: shared characters between consecutive chunks
+    Each chunk's metadata is enriched (chunk_id, chunk_size) as it's
+    emitted, so ids stay consecutive after merging — no second pass.
+    A merged chunk keeps the page of its first part.
     """
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,        # ~125 tokens per chunk
-        chunk_overlap=100,     # overlap to preserve context at boundaries
-        separators=["\n\n", "\n", " ", ""],  # try these in order
-        length_function=len,
-    )
+    def make_chunk(text: str, doc: Document, chunk_id: int) -> Document:
+        return Document(
+            page_content=text,
+            metadata={**doc.metadata, "chunk_id": chunk_id, "chunk_size": len(text)},
+        )
     
-    chunks = text_splitter.split_documents(documents)
+    chunk_id = 0
+    # Held-back chunk: (text, page it starts on, page it ends on)
+    pending = None
     
-    # Enrich metadata for each chunk so we can trace it back later
-    for i, chunk in enumerate(chunks):
-        chunk.metadata["chunk_id"] = i
-        chunk.metadata["chunk_size"] = len(chunk.page_content)
+    for doc in documents:
+        for text in split_text(normalize_text(doc.page_content)):
+            text = _WHITESPACE_RE.sub(" ", text)
+            if pending is not None:
+                pending_text, first_doc, last_doc = pending
+                # Same-page neighbors overlap — split_text() already merged those
+                if (last_doc is not doc
+                        and min(len(pending_text), len(text)) < MIN_CHUNK_SIZE
+                        and len(pending_text) + 1 + len(text) <= MAX_MERGED_CHUNK_SIZE):
+                    pending = (f"{pending_text} {text}", first_doc, doc)
+                    continue
+                yield make_chunk(pending_text, first_doc, chunk_id)
+                chunk_id += 1
+            pending = (text, doc, doc)
     
-    logger.info(f"Split into {len(chunks)} chunks")
-    return chunks
+    if pending is not None:
+        yield make_chunk(pending[0], pending[1], chunk_id)
+        chunk_id += 1
+    
+    logger.info(f"Split into {chunk_id} chunks")
+
+
+def file_sha256(file_path: str) -> str:
+    """SHA-256 of a file's bytes, read 1 MB at a time."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _chunk_cache_path(file_path: str) -> str:
+    return os.path.join(CHUNK_CACHE_DIR, f"{file_sha256(file_path)}-v{CHUNK_CACHE_VERSION}.pkl")
+
+
+def _load_cached_chunks(cache_path: str) -> Optional[List[Document]]:
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable chunk cache {cache_path}: {e}")
+        return None
+
+
+def _save_cached_chunks(cache_path: str, chunks: List[Document]) -> None:
+    """Best effort — a read-only filesystem just means no cache."""
+    try:
+        os.makedirs(CHUNK_CACHE_DIR, exist_ok=True)
+        with open(cache_path + ".tmp", "wb") as f:
+            pickle.dump(chunks, f)
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError as e:
+        logger.warning(f"Could not write chunk cache: {e}")
 
 
 def load_and_chunk(file_path: str) -> List[Document]:
     """
     Full pipeline: PDF → Documents → Chunks
     This is the main entry point used by vector_store.py
+
+    Pages stream through the splitter (iter_pages → chunk_documents), so
+    only the chunks — not every page's raw text as well — are held at
+    once. They're collected into a list because the cache and ingestion
+    (dedupe, local sidecar) need the whole set.
+
+    If this exact file (same bytes) was chunked before, the cached chunks
+    are returned without re-parsing the PDF.
     """
-    documents = load_pdf(file_path)
-    chunks = chunk_documents(documents)
+    cache_path = _chunk_cache_path(file_path)
+    cached = _load_cached_chunks(cache_path)
+    if cached is not None:
+        logger.info(f"Chunk cache hit: {len(cached)} chunks")
+        return cached
+
+    chunks = list(chunk_documents(iter_pages(file_path)))
     
     # Log a preview of the first chunk so you can verify it looks right
     if chunks:
         logger.info(f"Sample chunk:\n{chunks[0].page_content[:200]}...")
+        _save_cached_chunks(cache_path, chunks)
     
     return chunks
@@ -0,0 +1,115 @@
+"""
+session_store.py
+================
+CONCEPT: Conversation Memory Storage
+--------------------------------------
+Each (session_id, namespace) pair has a chat history — the LangChain
+messages sent back to the LLM so follow-up questions make sense.
+
+Where that history lives matters once the API runs as several uvicorn
+workers (separate processes):
+  - In-process dict → each worker has its OWN copy; a follow-up question
+    landing on another worker sees an empty history
+  - Redis → one shared store for all workers (and all machines)
+
+Two interchangeable backends, same async interface:
+  - RedisSessionStore  — used when REDIS_URL is set (production)
+  - MemorySessionStore — in-process TTLCache fallback (local dev)
+
+Both bound memory the same way: sessions expire SESSION_TTL_SECONDS after
+their last message, and only the last MAX_HISTORY_MESSAGES are kept.
+"""
+
+from cachetools import TTLCache
+from langchain.schema import BaseMessage
+from src.env import getenv
+from typing import List
+import pickle
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL_SECONDS = 3600
+MAX_HISTORY_MESSAGES = 20  # last 10 question/answer turns
+MAX_MEMORY_SESSIONS = 10_000
+
+GLOB_CHARS = re.compile(r"([*?\[\]\\])")
+
+
+class MemorySessionStore:
+    """
+    In-process session store (single worker only).
+    At most MAX_MEMORY_SESSIONS sessions, evicted by TTL then LRU.
+    """
+
+    def __init__(self):
+        self._cache: TTLCache = TTLCache(maxsize=MAX_MEMORY_SESSIONS, ttl=SESSION_TTL_SECONDS)
+
+    async def get_history(self, session_key: str) -> List[BaseMessage]:
+        return self._cache.get(session_key, [])
+
+    async def save_history(self, session_key: str, chat_history: List[BaseMessage]) -> None:
+        """Store the (trimmed) history; re-setting also refreshes its TTL."""
+        self._cache[session_key] = chat_history[-MAX_HISTORY_MESSAGES:]
+
+    async def delete_namespace(self, namespace: str) -> None:
+        for key in [k for k in self._cache if k.endswith(f":{namespace}")]:
+            self._cache.pop(key, None)
+
+    def expire(self) -> None:
+        """
+        TTLCache only drops expired entries when it's touched — call this
+        periodically so idle sessions release memory without new traffic.
+        """
+        self._cache.expire()
+
+
+class RedisSessionStore:
+    """
+    Redis-backed session store, shared by every worker.
+
+    Histories are pickled LangChain message lists stored with a TTL, so
+    Redis does the expiry for us. A connection pool avoids a TCP
+    handshake per operation.
+    """
+
+    KEY_PREFIX = "session:"
+
+    def __init__(self, url: str, max_connections: int = 50):
+        import redis.asyncio as redis  # only needed when Redis is configured
+
+        pool = redis.ConnectionPool.from_url(url, max_connections=max_connections)
+        self._redis = redis.Redis(connection_pool=pool, decode_responses=False)
+
+    async def get_history(self, session_key: str) -> List[BaseMessage]:
+        data = await self._redis.get(self.KEY_PREFIX + session_key)
+        return pickle.loads(data) if data else []
+
+    async def save_history(self, session_key: str, chat_history: List[BaseMessage]) -> None:
+        await self._redis.set(
+            self.KEY_PREFIX + session_key,
+            pickle.dumps(chat_history[-MAX_HISTORY_MESSAGES:]),
+            ex=SESSION_TTL_SECONDS,
+        )
+
+    async def delete_namespace(self, namespace: str) -> None:
+        # Escape glob characters so the namespace is matched literally
+        literal_namespace = GLOB_CHARS.sub(r"\\\1", namespace)
+        pattern = f"{self.KEY_PREFIX}*:{literal_namespace}"
+        keys = [key async for key in self._redis.scan_iter(match=pattern)]
+        if keys:
+            await self._redis.delete(*keys)
+
+    def expire(self) -> None:
+        """No-op: Redis expires keys itself."""
+
+
+def get_session_store():
+    """Use Redis when REDIS_URL is set, otherwise fall back to in-process memory."""
+    url = getenv("REDIS_URL")
+    if url:
+        logger.info("Using Redis session store")
+        return RedisSessionStore(url)
+    logger.info("REDIS_URL not set — using in-memory session store (single worker only)")
+    return MemorySessionStore()
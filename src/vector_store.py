@@ -20,35 +20,102 @@ How similarity search works:
 Cosine similarity: measures the angle between two vectors.
   - Score of 1.0 = identical meaning
   - Score of 0.0 = completely unrelated
+
+Local fast path (LocalVectorStore):
+  Pinecone is built for millions of vectors — one resume is < 100 chunks,
+  a few hundred KB of floats. At ingestion we also save the namespace's
+  embedding matrix as a NumPy .npy "sidecar" file. At query time, if the
+  sidecar exists, search is a single in-memory matrix-vector product
+  (< 1 ms) instead of a network round-trip to Pinecone (~50-100 ms).
+  Pinecone remains the source of truth and the fallback.
+  The sidecar matrix is stored as int8 (see quantize_int8) — 4× smaller
+  on disk and in memory than float32, with the same top-k ranking up to
+  rounding.
 """
 
-from pinecone import Pinecone, ServerlessSpec
+from pinecone import ServerlessSpec
+from pinecone.grpc import PineconeGRPC
 from langchain_pinecone import PineconeVectorStore
 from langchain.schema import Document
-from src.embeddings import get_embeddings
-from dotenv import load_dotenv
-from typing import List
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from src.embeddings import get_embeddings, get_cached_embeddings, CACHE_DIR, EMBEDDING_DIMENSION
+from src.env import getenv
+from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+from urllib.parse import quote
+from collections import deque
+import numpy as np
+import asyncio
+import hashlib
+import math
+import threading
+import pickle
 import os
 import logging
 import time
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Chunks per embed_documents() call + Pinecone upsert request
+EMBED_BATCH_SIZE = 128
+# Batches embedded at the same time during ingestion
+MAX_PARALLEL_BATCHES = 4
+# Upsert requests allowed in flight at once
+MAX_IN_FLIGHT_UPSERTS = 4
+# Embedded batches waiting to be upserted (producer → consumer queue)
+UPSERT_QUEUE_SIZE = 2
+
+# Ids per fetch() / delete() request when syncing a re-uploaded resume
+FETCH_BATCH_SIZE = 100
+DELETE_BATCH_SIZE = 1000
+# Metadata that changes on every upload without the chunk itself changing:
+# "source" is the upload's temp file path, and "chunk_id" shifts whenever a
+# chunk is inserted or removed before it. Ignored when deciding whether a
+# stored vector needs re-upserting (the local sidecar always gets fresh values).
+VOLATILE_METADATA_KEYS = ("source", "chunk_id")
+
+# Seconds to wait for a newly created index to become ready
+INDEX_READY_TIMEOUT = 60
 
-def get_pinecone_client() -> Pinecone:
-    """Initialize and return Pinecone client."""
-    api_key = os.getenv("PINECONE_API_KEY")
+# Per-namespace embedding matrices (.npy) + chunk texts/metadata (.pkl)
+VECTOR_CACHE_DIR = os.path.join(CACHE_DIR, "vectors")
+
+
+@lru_cache(maxsize=1)
+def get_pinecone_client() -> PineconeGRPC:
+    """
+    Initialize and return Pinecone client.
+    Cached: one client (and its connection pool) per process.
+
+    We use the gRPC client: data-plane calls (upsert, query, delete) go
+    over one HTTP/2 channel as Protobuf instead of JSON over REST —
+    smaller requests, and concurrent calls are multiplexed on a single
+    connection. Needs the grpc extra: pip install "pinecone-client[grpc]".
+    """
+    api_key = getenv("PINECONE_API_KEY")
     if not api_key:
         raise ValueError("PINECONE_API_KEY not set in .env file")
-    return Pinecone(api_key=api_key)
+    return PineconeGRPC(api_key=api_key)
+
+
+@lru_cache(maxsize=8)
+def _get_index(index_name: str):
+    """
+    Cached Index handle, shared by ingestion, queries and deletes so
+    they reuse the same open gRPC channel (no new TLS handshake per
+    request).
+    """
+    return get_pinecone_client().Index(index_name)
 
 
-def ensure_index_exists(pc: Pinecone, index_name: str) -> None:
+def ensure_index_exists(pc: PineconeGRPC, index_name: str) -> None:
     """
     Create the Pinecone index if it doesn't exist yet.
     
-    dimension=1536 must match OpenAI's text-embedding-3-small output size.
+    dimension=EMBEDDING_DIMENSION (384) must match all-MiniLM-L6-v2's
+    output size — 4× smaller vectors than OpenAI's 1536, so 4× less to
+    upsert and store per chunk.
     metric="cosine" is best for text similarity tasks.
     
     ServerlessSpec uses Pinecone's free serverless tier (no pods needed).
@@ -59,64 +126,450 @@ def ensure_index_exists(pc: Pinecone, index_name: str) -> None:
         logger.info(f"Creating Pinecone index: {index_name}")
         pc.create_index(
             name=index_name,
-            dimension=1536,          # must match embedding model output
+            dimension=EMBEDDING_DIMENSION,  # must match embedding model output
             metric="cosine",         # cosine similarity for text
             spec=ServerlessSpec(
                 cloud="aws",
                 region="us-east-1"   # free tier region
             )
         )
-        # Wait for index to be ready (usually 10-30 seconds)
+        # Poll until the index is ready instead of sleeping a fixed time
         logger.info("Waiting for index to be ready...")
-        time.sleep(20)
+        deadline = time.monotonic() + INDEX_READY_TIMEOUT
+        delay = 0.1
+        while not pc.describe_index(index_name).status.get("ready"):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Pinecone index '{index_name}' not ready after {INDEX_READY_TIMEOUT}s")
+            time.sleep(delay)
+            delay = min(delay * 1.5, 0.2)
     else:
         logger.info(f"Index '{index_name}' already exists, skipping creation")
 
 
-def ingest_resume(chunks: List[Document], namespace: str = "default") -> PineconeVectorStore:
+def chunk_vector_id(text: str) -> str:
+    """
+    Deterministic vector id: the first 32 hex chars of the text's SHA-256.
+
+    The same chunk text always gets the same id, so re-uploading a resume
+    upserts over its existing vectors instead of adding duplicates, and
+    we can tell which chunks are already stored before embedding anything.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def _vector_metadata(chunk: Document) -> Dict[str, Any]:
+    """Chunk metadata + its text under "text" — the key PineconeVectorStore reads back."""
+    return {**chunk.metadata, "text": chunk.page_content}
+
+
+def _stable_metadata(metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Metadata minus VOLATILE_METADATA_KEYS — what decides if a stored vector is up to date."""
+    return {key: value for key, value in (metadata or {}).items() if key not in VOLATILE_METADATA_KEYS}
+
+
+def _fetch_existing(index, ids: List[str], namespace: str) -> Dict[str, Any]:
+    """Already-stored vectors for `ids`, as {id: Vector}. Missing ids are simply absent."""
+    existing = {}
+    for start in range(0, len(ids), FETCH_BATCH_SIZE):
+        response = index.fetch(ids=ids[start:start + FETCH_BATCH_SIZE], namespace=namespace)
+        existing.update(response.vectors)
+    return existing
+
+
+def _delete_stale(index, keep_ids: set, namespace: str) -> int:
+    """Delete every vector in the namespace whose id isn't in keep_ids."""
+    stale = [
+        vector_id
+        for page in index.list(namespace=namespace)
+        for vector_id in page
+        if vector_id not in keep_ids
+    ]
+    for start in range(0, len(stale), DELETE_BATCH_SIZE):
+        index.delete(ids=stale[start:start + DELETE_BATCH_SIZE], namespace=namespace)
+    return len(stale)
+
+
+async def aingest_resume(
+    chunks: List[Document],
+    namespace: str = "default",
+    batch_size: int = EMBED_BATCH_SIZE,
+    max_parallel: int = MAX_PARALLEL_BATCHES,
+) -> PineconeVectorStore:
     """
-    INGESTION PIPELINE:
-    chunks → embed each chunk → upsert vectors into Pinecone
+    INGESTION PIPELINE (incremental):
+    chunks → content-hash ids → fetch what's already stored
+           → embed only NEW texts ─Queue(2)→ upsert → delete stale ids
     
     namespace: lets you store multiple resumes in the same index
     by separating them into isolated partitions.
     
-    LangChain's PineconeVectorStore.from_documents() handles:
-    - Calling the embedding model for each chunk
-    - Formatting vectors for Pinecone's API
-    - Upserting in batches (100 vectors at a time)
+    INCREMENTAL RE-UPLOAD:
+    Every vector's id is the hash of its chunk text (chunk_vector_id), so
+    there's no need to wipe the namespace before re-ingesting. We fetch
+    the ids we're about to write and:
+    - NEW text (id not stored yet) → embedded and upserted
+    - UNCHANGED text, same metadata → nothing to do
+    - UNCHANGED text, new metadata (e.g. it moved to another page) →
+      re-upserted with the stored vector, no re-embedding. Keys that
+      change on every upload (VOLATILE_METADATA_KEYS) don't count.
+    - ids stored but no longer in the resume → deleted at the end
+    Re-uploading an edited resume costs O(changed chunks), and the
+    namespace is never empty mid-upload. Chunks with identical text
+    share one id, so they're stored (and embedded) once.
+    
+    Why not PineconeVectorStore.from_documents()?
+    We embed chunks in batches with ONE embed_documents() call each (the
+    model sees them as a single batched tensor), and upsert the
+    precomputed vectors directly — one Pinecone request per batch
+    instead of one per chunk. batch_size stays ≤ 1000 (Pinecone's per
+    request vector limit); the default of 128 keeps each request small.
+    
+    Two stages run at the same time, connected by a bounded queue:
+    - PRODUCER embeds batches, at most max_parallel at a time, and
+      queues each one as soon as it's done. A new batch only starts
+      after a finished one has been queued. Small resumes are spread
+      over max_parallel batches so they benefit too.
+    - CONSUMER takes embedded batches off the queue and upserts them.
+      Each upsert is sent with async_req=True (gRPC hands back a future
+      right away; requests are multiplexed on one channel); at most
+      MAX_IN_FLIGHT_UPSERTS are outstanding — before sending another,
+      we wait for the oldest. All are awaited before returning.
+    Total time approaches the slower stage instead of the sum of both.
+    The queue holds at most UPSERT_QUEUE_SIZE batches, so if Pinecone
+    falls behind, embedding pauses instead of piling up vectors.
+    If either stage fails, the other is cancelled and the error raised.
     """
     pc = get_pinecone_client()
-    index_name = os.getenv("PINECONE_INDEX_NAME", "resume-chat")
+    index_name = getenv("PINECONE_INDEX_NAME", "resume-chat")
     
-    ensure_index_exists(pc, index_name)
+    await asyncio.to_thread(ensure_index_exists, pc, index_name)
     
     logger.info(f"Ingesting {len(chunks)} chunks into namespace '{namespace}'")
     
     embeddings = get_embeddings()
+    cached_embeddings = get_cached_embeddings()  # skips chunks embedded before
+    index = await asyncio.to_thread(_get_index, index_name)
     
-    vector_store = PineconeVectorStore.from_documents(
-        documents=chunks,
-        embedding=embeddings,
-        index_name=index_name,
-        namespace=namespace,
+    # One record per distinct text (repeated headers/footers, ...),
+    # keeping the first chunk's metadata. Dicts keep insertion order.
+    unique: Dict[str, Document] = {}
+    for chunk in chunks:
+        unique.setdefault(chunk_vector_id(chunk.page_content), chunk)
+    ids = list(unique)
+    
+    # Every vector of the namespace lives in ONE preallocated float32
+    # matrix (row i ↔ ids[i]): embeddings are written into it batch by
+    # batch, upserts pass its rows straight to the gRPC client, and the
+    # sidecar is saved from it as-is — no per-vector Python float lists.
+    matrix = np.empty((len(ids), EMBEDDING_DIMENSION), dtype=np.float32)
+    row_of = {vector_id: row for row, vector_id in enumerate(ids)}
+    
+    existing = await asyncio.to_thread(_fetch_existing, index, ids, namespace)
+    for vector_id, vector in existing.items():
+        matrix[row_of[vector_id]] = vector.values
+    new_ids = [vector_id for vector_id in ids if vector_id not in existing]
+    changed_ids = [
+        vector_id for vector_id in ids
+        if vector_id in existing
+        and _stable_metadata(existing[vector_id].metadata) != _stable_metadata(_vector_metadata(unique[vector_id]))
+    ]
+    logger.info(
+        f"{len(new_ids)} new, {len(changed_ids)} with new metadata, "
+        f"{len(ids) - len(new_ids) - len(changed_ids)} unchanged"
+    )
+    
+    # New texts are spread over max_parallel embedding batches; changed
+    # ones need no embedding and go out in full batch_size upserts
+    embed_batch_size = max(1, min(batch_size, math.ceil(len(new_ids) / max_parallel)))
+    batches = [new_ids[start:start + embed_batch_size] for start in range(0, len(new_ids), embed_batch_size)]
+    queue: asyncio.Queue = asyncio.Queue(maxsize=UPSERT_QUEUE_SIZE)
+    
+    async def embed_batch(batch: List[str]) -> List[str]:
+        batch_vectors = await cached_embeddings.aembed_documents(
+            [unique[vector_id].page_content for vector_id in batch]
+        )
+        matrix[[row_of[vector_id] for vector_id in batch]] = batch_vectors
+        return batch
+    
+    async def produce() -> None:
+        remaining = iter(batches)
+        started = []     # every embed task, so none is left behind on failure
+        running = set()  # at most max_parallel of them
+        
+        def start_next() -> None:
+            if (batch := next(remaining, None)) is not None:
+                started.append(asyncio.ensure_future(embed_batch(batch)))
+                running.add(started[-1])
+        
+        try:
+            # Stored vectors whose metadata changed need no embedding
+            for start in range(0, len(changed_ids), batch_size):
+                await queue.put(changed_ids[start:start + batch_size])
+            for _ in range(max_parallel):
+                start_next()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    running.discard(task)
+                    # Blocks while the queue is full — and until then no
+                    # new batch is started: that's the backpressure
+                    await queue.put(task.result())
+                    start_next()
+            await queue.put(None)  # sentinel: no more batches
+        except asyncio.CancelledError:
+            raise  # the consumer failed — nobody reads the queue any more
+        except BaseException:
+            await queue.put(None)  # let the consumer finish what's queued
+            raise
+        finally:
+            # On failure: stop the other embeddings and collect their results
+            for task in started:
+                task.cancel()
+            await asyncio.gather(*started, return_exceptions=True)
+    
+    async def consume() -> None:
+        in_flight = deque()  # pending upsert futures, oldest first
+        while (batch := await queue.get()) is not None:
+            records = [
+                (vector_id, matrix[row_of[vector_id]], _vector_metadata(unique[vector_id]))
+                for vector_id in batch
+            ]
+            while len(in_flight) >= MAX_IN_FLIGHT_UPSERTS:
+                await asyncio.to_thread(in_flight.popleft().result)
+            in_flight.append(index.upsert(vectors=records, namespace=namespace, async_req=True))
+        while in_flight:
+            await asyncio.to_thread(in_flight.popleft().result)  # raises if an upsert failed
+    
+    producer = asyncio.ensure_future(produce())
+    try:
+        await consume()
+    except BaseException:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+        raise
+    await producer  # raises if embedding failed
+    
+    # Only once everything new is stored: drop what the resume no longer has
+    deleted = await asyncio.to_thread(_delete_stale, index, set(ids), namespace)
+    if deleted:
+        logger.info(f"Deleted {deleted} stale vectors")
+    
+    await asyncio.to_thread(
+        save_local_vectors,
+        namespace,
+        [unique[vector_id].page_content for vector_id in ids],
+        [unique[vector_id].metadata for vector_id in ids],
+        matrix,
     )
     
     logger.info("Ingestion complete!")
-    return vector_store
+    return PineconeVectorStore(index=index, embedding=embeddings, namespace=namespace)
 
 
-def get_vector_store(namespace: str = "default") -> PineconeVectorStore:
+def ingest_resume(chunks: List[Document], namespace: str = "default", **kwargs) -> PineconeVectorStore:
+    """
+    Synchronous wrapper around aingest_resume() for scripts and notebooks.
+    From async code (e.g. FastAPI endpoints), await aingest_resume() instead.
     """
-    Connect to an EXISTING Pinecone index for querying.
+    return asyncio.run(aingest_resume(chunks, namespace=namespace, **kwargs))
+
+
+# ─────────────────────────────────────────────
+# Local sidecar (in-memory search for small namespaces)
+# ─────────────────────────────────────────────
+
+def _sidecar_paths(namespace: str):
+    """(.npy, .pkl) paths for a namespace — quoted so it's always a safe filename."""
+    base = os.path.join(VECTOR_CACHE_DIR, quote(namespace, safe=""))
+    return base + ".npy", base + ".pkl"
+
+
+def namespace_generation(namespace: str) -> Optional[int]:
+    """
+    Changes every time a namespace is re-ingested or reset: the sidecar
+    .npy's mtime (ns), or None when there's no sidecar. Read from the
+    filesystem, so every worker process sees the same value.
+    """
+    try:
+        return os.stat(_sidecar_paths(namespace)[0]).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def save_local_vectors(
+    namespace: str,
+    texts: List[str],
+    metadatas: List[Dict[str, Any]],
+    vectors: np.ndarray,
+) -> None:
+    """
+    Save a namespace's embedding matrix + chunk texts next to Pinecone.
+    Best effort: on a read-only filesystem we just keep using Pinecone.
+    """
+    npy_path, pkl_path = _sidecar_paths(namespace)
+    try:
+        os.makedirs(VECTOR_CACHE_DIR, exist_ok=True)
+        # Write to temp files, then rename: readers never see half a file.
+        # The .npy goes last — its mtime tells readers the sidecar changed.
+        with open(pkl_path + ".tmp", "wb") as f:
+            pickle.dump((texts, metadatas), f)
+        os.replace(pkl_path + ".tmp", pkl_path)
+        with open(npy_path + ".tmp", "wb") as f:
+            np.save(f, quantize_int8(vectors))
+        os.replace(npy_path + ".tmp", npy_path)
+    except OSError as e:
+        logger.warning(f"Could not write local vector cache for '{namespace}': {e}")
+        # An old sidecar would keep serving the previous resume
+        try:
+            delete_local_vectors(namespace)
+        except OSError:
+            pass
+
+
+def quantize_int8(vectors: np.ndarray) -> np.ndarray:
+    """
+    FP32 → INT8: scale each component by 127 and round.
+
+    Embeddings are L2-normalized, so every component is in [-1, 1] and
+    fits int8 without clipping. Scores against an int8 matrix are the
+    cosine similarities × 127 — the scale is the same for every row, so
+    the top-k order is unchanged (up to rounding, ~0.4% per component).
+    """
+    matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, EMBEDDING_DIMENSION)
+    return np.clip(np.round(matrix * 127), -127, 127).astype(np.int8)
+
+
+def delete_local_vectors(namespace: str) -> None:
+    for path in _sidecar_paths(namespace):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Read-only, in-memory vector store backed by a namespace's .npy sidecar.
+
+    Search = scores = M @ q (vectors are L2-normalized, so that's cosine
+    similarity — scaled by 127 when M is int8), then np.argpartition for
+    the top-k without a full sort.
+
+    The sidecar is re-read if another worker rewrites it (mtime check),
+    and an empty result is returned if it's been deleted (namespace reset).
+    """
+
+    def __init__(self, namespace: str, embedding: Embeddings):
+        self.namespace = namespace
+        self._embedding = embedding
+        # (matrix, texts, metadatas, mtime) — swapped as ONE tuple under the
+        # lock, so concurrent searches never pair a new matrix with old texts
+        self._lock = threading.Lock()
+        self._snapshot: Tuple[np.ndarray, List[str], List[Dict[str, Any]], Optional[float]] = (
+            np.empty((0, 0), dtype=np.float32), [], [], None
+        )
+        self._refresh()
+
+    @classmethod
+    def load(cls, namespace: str, embedding: Embeddings) -> Optional["LocalVectorStore"]:
+        """Return a LocalVectorStore if the namespace has a sidecar, else None."""
+        npy_path, pkl_path = _sidecar_paths(namespace)
+        if not (os.path.exists(npy_path) and os.path.exists(pkl_path)):
+            return None
+        return cls(namespace, embedding)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._snapshot[0]
+
+    @property
+    def texts(self) -> List[str]:
+        return self._snapshot[1]
+
+    @property
+    def metadatas(self) -> List[Dict[str, Any]]:
+        return self._snapshot[2]
+
+    def _refresh(self) -> Tuple[np.ndarray, List[str], List[Dict[str, Any]], Optional[float]]:
+        """Return the current snapshot, re-reading the sidecar first if it changed."""
+        npy_path, pkl_path = _sidecar_paths(self.namespace)
+        with self._lock:
+            try:
+                mtime = os.stat(npy_path).st_mtime
+            except FileNotFoundError:
+                self._snapshot = (np.empty((0, 0), dtype=np.float32), [], [], None)
+                return self._snapshot
+            if mtime == self._snapshot[3]:
+                return self._snapshot
+            matrix = np.load(npy_path)
+            with open(pkl_path, "rb") as f:
+                texts, metadatas = pickle.load(f)
+            # Caught between the writer's two renames: keep the old snapshot
+            # and pick the new one up on the next search
+            if len(matrix) == len(texts):
+                self._snapshot = (matrix, texts, metadatas, mtime)
+            return self._snapshot
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: List[float], k: int = 4, **kwargs
+    ) -> List[Tuple[Document, float]]:
+        matrix, texts, metadatas, _ = self._refresh()
+        n = len(texts)
+        if n == 0:
+            return []
+        k = min(k, n)
+
+        scores = matrix @ np.asarray(embedding, dtype=np.float32)
+        if matrix.dtype == np.int8:
+            scores /= 127                                  # back to cosine similarity
+        top = np.argpartition(-scores, k - 1)[:k]          # unordered top-k, O(n)
+        top = top[np.argsort(-scores[top])]                # order just those k
+        return [
+            (Document(page_content=texts[i], metadata=metadatas[i]), float(scores[i]))
+            for i in top
+        ]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k=k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        return self.similarity_search_by_vector(self._embedding.embed_query(query), k=k)
+
+    def add_texts(self, texts, metadatas=None, **kwargs):
+        raise NotImplementedError("LocalVectorStore is read-only — use ingest_resume()")
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, **kwargs):
+        raise NotImplementedError("LocalVectorStore is read-only — use ingest_resume()")
+
+
+@lru_cache(maxsize=32)
+def get_vector_store(namespace: str = "default") -> VectorStore:
+    """
+    Connect to the vector store for a namespace, for querying.
     Used at query time — we don't re-ingest, just load the connection.
+
+    Uses the local in-memory sidecar when one exists, otherwise connects
+    to the EXISTING Pinecone index.
+
+    Cached per namespace, so the store (model, Pinecone client, matrix)
+    is created once and reused by every /chat request. Call
+    get_vector_store.cache_clear() after (re-)ingesting a namespace.
     """
-    pc = get_pinecone_client()
-    index_name = os.getenv("PINECONE_INDEX_NAME", "resume-chat")
+    local = LocalVectorStore.load(namespace, get_embeddings())
+    if local is not None:
+        logger.info(f"Using local vector cache for namespace: {namespace}")
+        return local
+    
+    index_name = getenv("PINECONE_INDEX_NAME", "resume-chat")
     embeddings = get_embeddings()
     
     return PineconeVectorStore(
-        index=pc.Index(index_name),
+        index=_get_index(index_name),
         embedding=embeddings,
         namespace=namespace,
     )
@@ -124,11 +577,13 @@ def get_vector_store(namespace: str = "default") -> PineconeVectorStore:
 
 def delete_namespace(namespace: str) -> None:
     """
-    Delete all vectors in a namespace (e.g., when re-uploading a resume).
-    This avoids duplicate vectors from multiple uploads of the same resume.
+    Delete all vectors in a namespace — a full reset (/reset).
+    Re-uploads don't need this: vector ids are content hashes, so
+    aingest_resume() updates the namespace in place.
+    The local sidecar goes too.
     """
-    pc = get_pinecone_client()
-    index_name = os.getenv("PINECONE_INDEX_NAME", "resume-chat")
-    index = pc.Index(index_name)
+    delete_local_vectors(namespace)
+    index_name = getenv("PINECONE_INDEX_NAME", "resume-chat")
+    index = _get_index(index_name)
     index.delete(delete_all=True, namespace=namespace)
     logger.info(f"Deleted namespace: {namespace}")
@@ -0,0 +1,90 @@
+"""
+API-level behaviour that doesn't need Pinecone, Groq or model downloads.
+"""
+
+import asyncio
+import os
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import api.index as api
+import src.vector_store as vector_store
+from src.embeddings import EMBEDDING_DIMENSION
+
+
+def save_sidecar(namespace, mtime_ns):
+    vector_store.save_local_vectors(
+        namespace, ["chunk"], [{"page": 0}], np.eye(1, EMBEDDING_DIMENSION, dtype=np.float32)
+    )
+    npy_path, _ = vector_store._sidecar_paths(namespace)
+    os.utime(npy_path, ns=(mtime_ns, mtime_ns))
+
+
+def test_semantic_cache_misses_after_another_worker_reingests(monkeypatch, tmp_path):
+    monkeypatch.setattr(vector_store, "VECTOR_CACHE_DIR", str(tmp_path))
+    cache = api.SemanticCache(max_entries=4)
+    q_vec = np.eye(1, EMBEDDING_DIMENSION, dtype=np.float32)[0]
+
+    save_sidecar("resume", 1_000_000_000)
+    cache.add("resume", api.namespace_generation("resume"), q_vec, "old answer", [])
+    assert cache.lookup("resume", api.namespace_generation("resume"), q_vec)[0] == "old answer"
+
+    # Re-uploaded by another worker: this one never calls invalidate()
+    save_sidecar("resume", 2_000_000_000)
+    assert cache.lookup("resume", api.namespace_generation("resume"), q_vec) is None
+
+    # Reset by another worker: the sidecar is gone
+    vector_store.delete_local_vectors("resume")
+    assert cache.lookup("resume", api.namespace_generation("resume"), q_vec) is None
+
+
+def test_semantic_cache_invalidate_keeps_other_namespaces():
+    cache = api.SemanticCache(max_entries=4)
+    q_vec = np.eye(1, EMBEDDING_DIMENSION, dtype=np.float32)[0]
+    cache.add("a", None, q_vec, "answer a", [])
+    cache.add("b", None, q_vec, "answer b", [])
+
+    cache.invalidate("a")
+
+    assert cache.lookup("a", None, q_vec) is None
+    assert cache.lookup("b", None, q_vec)[0] == "answer b"
+
+
+def test_chat_builds_chain_off_the_event_loop(monkeypatch):
+    calls = []
+
+    def fake_get_chain(namespace):
+        try:
+            asyncio.get_running_loop()
+            calls.append("event loop")
+        except RuntimeError:
+            calls.append("worker thread")
+        return object()
+
+    async def fake_embed_question(question):
+        return np.eye(1, EMBEDDING_DIMENSION, dtype=np.float32)[0]
+
+    def fake_ask_question(chain, question, chat_history, query_vector):
+        return {"answer": "Python.", "sources": [{"text": "chunk", "page": 0}], "chat_history": []}
+
+    async def fake_astream_question(chain, question, chat_history, query_vector):
+        yield {"token": "Python."}
+        yield fake_ask_question(chain, question, chat_history, query_vector)
+
+    monkeypatch.setattr(api, "get_chain", fake_get_chain)
+    monkeypatch.setattr(api, "embed_question", fake_embed_question)
+    monkeypatch.setattr(api, "ask_question", fake_ask_question)
+    monkeypatch.setattr(api, "astream_question", fake_astream_question)
+    monkeypatch.setattr(api, "semantic_cache", api.SemanticCache(max_entries=4))
+    client = TestClient(api.app)
+
+    response = client.post("/chat", json={"question": "Python?", "session_id": "s1", "namespace": "ns"})
+    assert response.status_code == 200
+    assert response.json()["answer"] == "Python."
+
+    # Another namespace, so the answer isn't served from the semantic cache
+    response = client.post("/chat/stream", json={"question": "Python?", "session_id": "s2", "namespace": "other"})
+    assert 'data: {"sources":[{"text":"chunk","page":0}]}' in response.text
+
+    assert calls == ["worker thread", "worker thread"]
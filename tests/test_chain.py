@@ -0,0 +1,88 @@
+"""
+The RAG chain against a real PineconeVectorStore wrapping a fake index —
+no Pinecone, Groq or model downloads needed.
+"""
+
+import asyncio
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import FakeListChatModel
+from langchain_pinecone import PineconeVectorStore
+
+import src.chain as chain_module
+from src.chain import FETCH_K, TOP_K, ask_question, astream_question, build_rag_chain
+
+QUERY_VECTOR = [0.1, 0.2, 0.3]
+
+
+class FakeIndex:
+    """Answers query() like Pinecone does; records what it was asked."""
+
+    def __init__(self, num_chunks: int = 10):
+        self.num_chunks = num_chunks
+        self.queries = []
+
+    def query(self, vector, top_k, include_metadata, namespace, filter=None):
+        self.queries.append({"vector": vector, "top_k": top_k, "namespace": namespace})
+        return {
+            "matches": [
+                {"score": 1.0 - i / 100, "metadata": {"text": f"chunk {i}", "page": float(i)}}
+                for i in range(min(top_k, self.num_chunks))
+            ]
+        }
+
+
+class FakeEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [QUERY_VECTOR for _ in texts]
+
+    def embed_query(self, text):
+        return QUERY_VECTOR
+
+
+def make_chain(monkeypatch, index):
+    monkeypatch.setattr(
+        chain_module, "ChatGroq", lambda **kwargs: FakeListChatModel(responses=["Five years of Python."])
+    )
+    monkeypatch.setattr(chain_module, "rerank", lambda question, docs, top_n: docs[:top_n])
+    store = PineconeVectorStore(index=index, embedding=FakeEmbeddings(), namespace="resume")
+    chain, _ = build_rag_chain(store)
+    return chain
+
+
+def test_ask_question_with_precomputed_vector(monkeypatch):
+    index = FakeIndex()
+    chain = make_chain(monkeypatch, index)
+
+    result = ask_question(chain, "How much Python?", [], query_vector=QUERY_VECTOR)
+
+    assert result["answer"] == "Five years of Python."
+    assert [source["text"] for source in result["sources"]] == [f"chunk {i}" for i in range(TOP_K)]
+    assert [type(source["page"]) for source in result["sources"]] == [int] * TOP_K
+    assert index.queries == [{"vector": QUERY_VECTOR, "top_k": FETCH_K, "namespace": "resume"}]
+    assert len(result["chat_history"]) == 2
+
+
+def test_ask_question_embeds_question_without_vector(monkeypatch):
+    index = FakeIndex()
+    chain = make_chain(monkeypatch, index)
+
+    result = ask_question(chain, "How much Python?")
+
+    assert result["answer"] == "Five years of Python."
+    assert len(result["sources"]) == TOP_K
+    assert index.queries[0]["vector"] == QUERY_VECTOR
+
+
+def test_astream_question_with_precomputed_vector(monkeypatch):
+    chain = make_chain(monkeypatch, FakeIndex())
+
+    async def collect():
+        return [event async for event in astream_question(chain, "How much Python?", [], QUERY_VECTOR)]
+
+    events = asyncio.run(collect())
+
+    assert "".join(event["token"] for event in events[:-1]) == "Five years of Python."
+    assert events[-1]["answer"] == "Five years of Python."
+    assert events[-1]["sources"] == [{"text": f"chunk {i}", "page": i} for i in range(TOP_K)]
+    assert all(type(source["page"]) is int for source in events[-1]["sources"])
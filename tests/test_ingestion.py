@@ -0,0 +1,22 @@
+"""
+Text normalization applied to extracted PDF text before chunking.
+"""
+
+import pytest
+
+from src.ingestion import normalize_text
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("state-of-the-\nart", "state-of-the-art"),
+        ("cross-\n  functional teams", "cross-functional teams"),
+        ("Python-\nDjango", "Python-\nDjango"),
+        ("engi\u00ad\nneering", "engineering"),
+        ("co\u00adop", "coop"),
+        ("\ufb01nance", "finance"),
+    ],
+)
+def test_normalize_text(raw, expected):
+    assert normalize_text(raw) == expected
@@ -0,0 +1,237 @@
+"""
+Incremental ingestion (aingest_resume) against a fake gRPC index and a
+fake embedder — no Pinecone or model downloads needed.
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+
+import src.vector_store as vector_store
+from src.embeddings import EMBEDDING_DIMENSION
+from src.vector_store import aingest_resume
+
+
+class FakeFuture:
+    """Upsert future: result() waits for `release`, then raises `error` if set."""
+
+    def __init__(self, release, error=None):
+        self.release = release
+        self.error = error
+
+    def result(self):
+        self.release.wait()
+        if self.error:
+            raise self.error
+
+
+class FakeVector:
+    def __init__(self, vector_id, values, metadata):
+        self.id = vector_id
+        self.values = values
+        self.metadata = metadata
+
+
+class FakeFetchResponse:
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+
+class FakeIndex:
+    """In-memory stand-in for a GRPCIndex namespace; counts upsert requests."""
+
+    def __init__(self):
+        self.store = {}
+        self.upsert_sizes = []
+        self.release = threading.Event()
+        self.release.set()
+        self.upsert_error = None
+
+    def fetch(self, ids, namespace):
+        return FakeFetchResponse({i: self.store[i] for i in ids if i in self.store})
+
+    def upsert(self, vectors, namespace, async_req=False):
+        self.upsert_sizes.append(len(vectors))
+        for vector_id, values, metadata in vectors:
+            # Pinecone hands numbers back as floats
+            metadata = {k: float(v) if isinstance(v, int) else v for k, v in metadata.items()}
+            self.store[vector_id] = FakeVector(vector_id, np.asarray(values).tolist(), metadata)
+        return FakeFuture(self.release, self.upsert_error)
+
+    def list(self, namespace):
+        ids = list(self.store)
+        for start in range(0, len(ids), 10):
+            yield ids[start:start + 10]
+
+    def delete(self, ids, namespace):
+        for vector_id in ids:
+            del self.store[vector_id]
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic unit vectors; remembers every text it embedded."""
+
+    def __init__(self):
+        self.embedded = []
+        self.fail_on = None
+
+    def embed_documents(self, texts):
+        if self.fail_on in texts:
+            raise RuntimeError("embedding failed")
+        self.embedded.extend(texts)
+        vectors = []
+        for text in texts:
+            vector = np.random.default_rng(abs(hash(text)) % 2**32).standard_normal(EMBEDDING_DIMENSION)
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture
+def fakes(monkeypatch, tmp_path):
+    index = FakeIndex()
+    embeddings = FakeEmbeddings()
+    monkeypatch.setattr(vector_store, "get_pinecone_client", lambda: None)
+    monkeypatch.setattr(vector_store, "ensure_index_exists", lambda pc, name: None)
+    monkeypatch.setattr(vector_store, "_get_index", lambda name: index)
+    monkeypatch.setattr(vector_store, "get_embeddings", lambda: embeddings)
+    monkeypatch.setattr(vector_store, "get_cached_embeddings", lambda: embeddings)
+    monkeypatch.setattr(vector_store, "VECTOR_CACHE_DIR", str(tmp_path))
+    return index, embeddings
+
+
+def make_chunks(texts, source, page=0):
+    return [
+        Document(page_content=text, metadata={"source": source, "page": page, "chunk_id": i})
+        for i, text in enumerate(texts)
+    ]
+
+
+def ingest(chunks):
+    asyncio.run(aingest_resume(chunks, namespace="resume"))
+
+
+def test_reupload_with_one_inserted_chunk_only_embeds_and_upserts_it(fakes):
+    index, embeddings = fakes
+    texts = [f"experience line {i}" for i in range(41)]
+    ingest(make_chunks(texts, "/tmp/upload-a.pdf"))
+    embeddings.embedded.clear()
+    index.upsert_sizes.clear()
+
+    # New temp file path, and every chunk after the insert gets a new chunk_id
+    ingest(make_chunks(texts[:5] + ["new certification"] + texts[5:], "/tmp/upload-b.pdf"))
+
+    assert embeddings.embedded == ["new certification"]
+    assert index.upsert_sizes == [1]
+    assert len(index.store) == 42
+
+
+def test_changed_metadata_is_upserted_in_full_batches(fakes):
+    index, embeddings = fakes
+    texts = [f"experience line {i}" for i in range(41)]
+    ingest(make_chunks(texts, "/tmp/upload-a.pdf", page=0))
+    embeddings.embedded.clear()
+    index.upsert_sizes.clear()
+
+    ingest(make_chunks(texts, "/tmp/upload-b.pdf", page=1))
+
+    assert embeddings.embedded == []
+    assert index.upsert_sizes == [41]
+    assert all(vector.metadata["page"] == 1 for vector in index.store.values())
+
+
+def test_removed_chunks_are_deleted_and_sidecar_matches(fakes):
+    index, _ = fakes
+    texts = [f"experience line {i}" for i in range(30)]
+    ingest(make_chunks(texts, "/tmp/upload-a.pdf"))
+
+    ingest(make_chunks(texts[:20], "/tmp/upload-b.pdf"))
+
+    assert len(index.store) == 20
+    local = vector_store.LocalVectorStore.load("resume", FakeEmbeddings())
+    assert local.texts == texts[:20]
+    assert local.matrix.shape == (20, EMBEDDING_DIMENSION)
+
+
+def test_embedding_pauses_while_upserts_are_stuck(fakes):
+    index, embeddings = fakes
+    index.release.clear()
+    chunks = make_chunks([f"experience line {i}" for i in range(40)], "/tmp/upload-a.pdf")
+
+    async def run():
+        ingestion = asyncio.ensure_future(aingest_resume(chunks, namespace="resume", batch_size=1))
+        await asyncio.sleep(0.5)
+        embedded_while_stuck = len(embeddings.embedded)
+        index.release.set()
+        await ingestion
+        return embedded_while_stuck
+
+    embedded_while_stuck = asyncio.run(run())
+
+    # in-flight upserts + the one the consumer waits on + queue + the one
+    # the producer is putting + running embeddings — not all 40
+    limit = (vector_store.MAX_IN_FLIGHT_UPSERTS + 1 + vector_store.UPSERT_QUEUE_SIZE + 1
+             + vector_store.MAX_PARALLEL_BATCHES)
+    assert embedded_while_stuck <= limit
+    assert len(index.store) == 40
+
+
+@pytest.mark.parametrize("failure", ["embedding", "upsert"])
+def test_failure_raises_and_leaves_no_tasks_behind(fakes, failure):
+    index, embeddings = fakes
+    texts = [f"experience line {i}" for i in range(40)]
+    if failure == "embedding":
+        embeddings.fail_on = texts[7]
+    else:
+        index.upsert_error = RuntimeError("upsert failed")
+
+    async def run():
+        with pytest.raises(RuntimeError, match=f"{failure} failed"):
+            await aingest_resume(make_chunks(texts, "/tmp/upload-a.pdf"), namespace="resume", batch_size=1)
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+
+
+def test_local_store_search_is_consistent_while_sidecar_is_rewritten(fakes):
+    # Version A: row i is e_i; version B (twice as long): row i is e_(i+1).
+    # Querying e_3 must return A's row 3 or B's row 2 — never a mix.
+    eye = np.eye(EMBEDDING_DIMENSION, dtype=np.float32)
+    versions = [
+        ([f"A row {i}" for i in range(20)], eye[:20]),
+        ([f"B row {i}" for i in range(40)], eye[1:41]),
+    ]
+
+    def save(version):
+        texts, vectors = versions[version]
+        vector_store.save_local_vectors("resume", texts, [{"row": i} for i in range(len(texts))], vectors)
+
+    save(0)
+    local = vector_store.LocalVectorStore.load("resume", FakeEmbeddings())
+    stop = threading.Event()
+    results, errors = [], []
+
+    def search():
+        while not stop.is_set():
+            try:
+                results.append(local.similarity_search_by_vector(eye[3], k=40)[0].page_content)
+            except Exception as e:
+                errors.append(e)
+
+    readers = [threading.Thread(target=search) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(200):
+        save(i % 2)
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert set(results) <= {"A row 3", "B row 2"}